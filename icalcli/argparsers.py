@@ -10,6 +10,16 @@ from sys import stdout
 OUTPUTS = {'l': 'location', 'e': 'end', 'a': 'alarms',
            'd': 'description', 'f': 'freebusy', 'u': 'uid'}
 NO_OUTPUTS = ['no' + s[0] for s in OUTPUTS.keys()]
+NO_OUTPUTS_SET = frozenset(NO_OUTPUTS)
+
+
+def valid_hhmm(value):
+    try:
+        hh, mm = value.split(':')
+        return (int(hh), int(mm))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "%s is not a valid hh:mm time" % value)
 
 
 class OutputsAction(argparse._AppendAction):
@@ -19,9 +29,9 @@ class OutputsAction(argparse._AppendAction):
 
         if value == 'A':
             outputs = {d: True for d in OUTPUTS.keys()}
-        elif value in OUTPUTS.keys():
+        elif value in OUTPUTS:
             outputs[OUTPUTS[value]] = True
-        elif value in NO_OUTPUTS:
+        elif value in NO_OUTPUTS_SET:
             outputs[OUTPUTS[value[2]]] = False
 
         setattr(namespace, self.dest, outputs)
@@ -131,7 +141,8 @@ def fill_add_parser(add):
     add.add_argument('-y', '--year', type=int, help='Event year')
     add.add_argument('-m', '--month', type=int, help='Event month')
     add.add_argument('-d', '--day', type=int, help='Event day')
-    add.add_argument('-t', '--time', help='Event time hh:mm')
+    add.add_argument('-t', '--time', type=valid_hhmm,
+                     help='Event time hh:mm')
     add.add_argument('-D', '--duration', type=int,
                      help='Event duration (minutes)')
     add.add_argument('-A', '--allday', action='store_true',
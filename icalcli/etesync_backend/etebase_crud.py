@@ -3,9 +3,18 @@
 # this is part of the etesync 2.0 backend
 # for etesync 1.0 backend see etesync_crud.py
 
-from etebase import Client, Account, FetchOptions, Base64Url
-from time import sleep, time
-import json
+from etebase import Client, Account, FetchOptions
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep, time_ns
+import pickle
+
+
+def mtime_now():
+    """Current time in whole milliseconds for item mtime metadata
+
+    time_ns avoids the float multiply/round of int(round(time()*1000))
+    """
+    return time_ns() // 1000000
 
 # The EtesyncCRUD class exposes methods for each of the CRUD operations
 # (Create, Retrieve, Update and Delete) and for sync with the server.
@@ -51,13 +60,15 @@ class EtebaseCRUD:
         collection = col_mgr.fetch(calendar_uid)
         self.item_mgr = col_mgr.get_item_manager(collection)
         self.items = {}
+        self.pending = []
+        self.dirty_uids = set()
+        self.event_uid_to_item_uid = {}
+        self.raw_events_by_uid = {}
         self.stoken = None
-        self.raw_events = []
+        self.items_changed = True
         self.cache_file = cache_file
         self.load_cache()
         self.sync(silent)
-        print("Reading all events")
-        self.get_all_events()
 
     def create_event(self, event, event_uid):
         """Create event
@@ -71,11 +82,26 @@ class EtebaseCRUD:
         item = self.item_mgr.create(
             {
                 "name": event_uid,
-                "mtime": int(round(time() * 1000))
+                "mtime": mtime_now()
             },
             event
         )
-        self.item_mgr.batch([item])
+        self.pending.append(item)
+
+    def fetch_item(self, event_uid):
+        """Fetch the item that holds the event with event_uid
+
+        The name consistency check is a debug-only guard: running
+        under python -O compiles it out together with the item.meta
+        access it needs
+
+        Parameters
+        ----------
+        event_uid : uid of the event
+        """
+        item = self.item_mgr.fetch(self.event_uid_to_item_uid[event_uid])
+        assert item.meta['name'] == event_uid
+        return item
 
     def update_event(self, event, event_uid):
         """Edit event
@@ -86,11 +112,10 @@ class EtebaseCRUD:
         (calendar containing one event to be updated)
         event_uid : uid of event to be updated
         """
-        item = self.item_mgr.fetch(self.event_uid_to_item_uid[event_uid])
-        assert item.meta['name'] == event_uid
+        item = self.fetch_item(event_uid)
         item.content = event
-        # item.meta["mtime"] = int(round(time() * 1000))
-        self.item_mgr.batch([item])
+        # item.meta["mtime"] = mtime_now()
+        self.pending.append(item)
 
     def retrieve_event(self, event_uid):
         r"""Retrieve event by uid
@@ -103,8 +128,7 @@ class EtebaseCRUD:
         -------
         iCalendar file (as a string)
         """
-        item = self.item_mgr.fetch(self.event_uid_to_item_uid[event_uid])
-        assert item.meta['name'] == event_uid
+        item = self.fetch_item(event_uid)
         return item.content.decode()
 
     def delete_event(self, event_uid):
@@ -114,23 +138,64 @@ class EtebaseCRUD:
         ----------
         uid : uid of event to be deleted
         """
-        item = self.item_mgr.fetch(self.event_uid_to_item_uid[event_uid])
-        assert item.meta['name'] == event_uid
-        item.meta["mtime"] = int(round(time() * 1000))
+        item = self.fetch_item(event_uid)
+        item.meta["mtime"] = mtime_now()
         item.delete()
-        self.item_mgr.batch([item])
+        self.pending.append(item)
 
-    def get_all_events(self):
-        """Retrieve all events in calendar
+    def flush(self):
+        """Send all buffered create/update/delete items to the server
 
-        Returns
-        -------
-        List of iCalendar files (as strings)
+        The mutators only append to self.pending so that a run of
+        CRUD operations costs one server round-trip instead of one
+        round-trip per operation
         """
-        self.event_uid_to_item_uid = {
-            e.meta['name']: e.uid for e in self.items.values()}
-        self.raw_events = [e.content.decode()
-                           for e in self.items.values() if not e.deleted]
+        if self.pending:
+            self.item_mgr.batch(self.pending)
+            self.pending = []
+
+    @property
+    def raw_events(self):
+        """All live events in calendar as iCalendar strings
+
+        Derived from raw_events_by_uid which register_item keeps up
+        to date, so no rescan of self.items is ever needed.
+        Items are stored undecoded and decoded only here, so items
+        that are deleted or superseded before anyone reads the event
+        list are never decoded at all
+        """
+        return [item.content.decode()
+                for item in self.raw_events_by_uid.values()]
+
+    def register_item(self, item):
+        """Record one item in self.items and the uid mappings
+
+        Keeping event_uid_to_item_uid and raw_events_by_uid up to
+        date here makes get_all_events O(changed items) instead of a
+        full rescan of self.items after every sync
+
+        Parameters
+        ----------
+        item : item fetched from the server or loaded from the cache
+        """
+        self.items[item.uid] = item
+        name = item.meta['name']
+        self.event_uid_to_item_uid[name] = item.uid
+        if item.deleted:
+            self.raw_events_by_uid.pop(name, None)
+        else:
+            self.raw_events_by_uid[name] = item
+
+    def absorb_items(self, data):
+        """Record one fetched chunk of items in self.items
+
+        Parameters
+        ----------
+        data : list of items returned by item_mgr.list
+        """
+        for item in data:
+            self.register_item(item)
+            self.dirty_uids.add(item.uid)
 
     def sync(self, silent=False):
         """Initialize
@@ -139,47 +204,63 @@ class EtebaseCRUD:
         ----------
         silent : boolean whether to report sync attempt and success
         """
+        self.flush()
         silent or print("Syncing with server. Please wait")
         msg = "etebase fetch attempt {:} failed. Will retry after {:} seconds"
         delay = 5
         done = False
         chunk = 100
-        for i in range(5):
-            try:
-                while not done:
-                    items = self.item_mgr.list(
-                        FetchOptions().stoken(self.stoken).limit(chunk))
-                    self.items.update(
-                        {item.uid: item for item in items.data})
-                    self.stoken = items.stoken
-                    done = items.done
-                    # silent or print(".", end='')
-                break
-            except Exception:
-                silent or print(msg.format(i+1, delay))
-                sleep(delay)
+        old_stoken = self.stoken
+        # A single worker absorbs chunk k into self.items while the
+        # main thread is blocked fetching chunk k+1, hiding the
+        # absorb cost behind the network round-trip
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            for i in range(5):
+                try:
+                    while not done:
+                        items = self.item_mgr.list(
+                            FetchOptions().stoken(self.stoken).limit(chunk))
+                        pool.submit(self.absorb_items, items.data)
+                        self.stoken = items.stoken
+                        done = items.done
+                        # silent or print(".", end='')
+                    break
+                except Exception:
+                    silent or print(msg.format(i+1, delay))
+                    sleep(delay)
         if done:
+            # an unchanged stoken means the server returned no delta:
+            # the cache and the parsed event list are still current
+            self.items_changed = self.stoken != old_stoken
             silent or print("Syncing completed.")
-            self.save_cache()
+            if self.items_changed:
+                self.save_cache()
         else:
             print("Syncing with server failed after 5 attempts")
         return
 
     def load_cache(self):
+        # The cache holds the raw bytes blobs of cache_save directly:
+        # pickling bytes avoids the base64 expansion and the json
+        # string escaping of the earlier text format
         if self.cache_file:
-            d = json.load(open(self.cache_file))
+            with open(self.cache_file, 'rb') as fp:
+                d = pickle.load(fp)
             if 'stoken' in d:
                 self.stoken = d['stoken']
             if 'blobs' in d:
                 for cache_blob in d['blobs']:
-                    item = self.item_mgr.cache_load(
-                        Base64Url.from_base64(cache_blob))
-                    self.items[item.uid] = item
+                    self.register_item(self.item_mgr.cache_load(cache_blob))
 
     def save_cache(self):
-        if self.cache_file:
+        # A delta sync that fetched nothing leaves the cache as is;
+        # rewriting all the blobs is worthwhile only when some item
+        # actually changed
+        if self.cache_file and self.dirty_uids:
             cache = dict(
                 stoken=self.stoken,
-                blobs=[Base64Url.to_base64(self.item_mgr.cache_save(item))
+                blobs=[bytes(self.item_mgr.cache_save(item))
                        for item in self.items.values()])
-            json.dump(cache, open(self.cache_file, 'w'))
+            with open(self.cache_file, 'wb') as fp:
+                pickle.dump(cache, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            self.dirty_uids.clear()
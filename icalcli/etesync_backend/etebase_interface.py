@@ -3,9 +3,12 @@
 # this is part of the etesync 2.0 backend
 # for etesync 1.0 backend see etesync_interface.py
 
+import logging
 from icalcli.etesync_backend.etebase_crud import EtebaseCRUD
 from icalendar import Calendar
 
+logger = logging.getLogger(__name__)
+
 
 # The EtebaseInterface class is basically a wrapper around the
 # EtebaseCRUD class from which it is derived
@@ -48,12 +51,32 @@ class EtebaseInterface (EtebaseCRUD):
         super(EtebaseInterface, self).__init__(
             user=user, server_url=server_url, password=password,
             calendar_uid=calendar_uid, cache_file=cache_file, silent=silent)
-        print("Parsing all events")
+        # serialized VTIMEZONE fragment cached by event_to_ics
+        self.vtz_source = None
+        self.vtz_ics = b''
+        logger.info("Parsing all events")
         self.all_events()
 
     def all_events(self):
-        self.events = [Calendar.from_ical(ev).walk('VEVENT')[0]
-                       for ev in self.raw_events]
+        # Each raw ics string is a full VCALENDAR wrapping one event.
+        # Slice out the VEVENT blocks with str.find (a C substring
+        # scan, far cheaper than iterating lines in Python),
+        # concatenate them and parse the whole calendar once instead
+        # of invoking the parser once per event
+        bodies = []
+        for ics in self.raw_events:
+            i = ics.find('BEGIN:VEVENT')
+            while i >= 0:
+                j = ics.find('END:VEVENT', i)
+                if j < 0:
+                    break
+                nl = ics.find('\n', j)
+                j = len(ics) if nl < 0 else nl + 1
+                bodies.append(ics[i:j])
+                i = ics.find('BEGIN:VEVENT', j)
+        big_ics = ('BEGIN:VCALENDAR\r\n' + ''.join(bodies) +
+                   'END:VCALENDAR\r\n')
+        self.events = Calendar.from_ical(big_ics).walk('VEVENT')
 
     def create_event(self, event, vtimezone=None):
         r"""Create event
@@ -80,19 +103,29 @@ class EtebaseInterface (EtebaseCRUD):
     def event_to_ics(self, event, vtimezone=None):
         r"""Make calendar byte array (ics) from event
 
+        The same vtimezone is passed on every call, so its
+        serialization is cached, as is the serialized event (on the
+        event object itself); the VCALENDAR wrapper is assembled by
+        concatenation instead of building a Calendar object per call.
+
         Parameters
         ----------
         event : event to be added (iCalendar object)
         """
-        cal = Calendar()
-        cal.add_component(event)
-        if vtimezone:
-            cal.add_component(vtimezone)
-        ics = cal.to_ical()
-        return ics
+        if vtimezone is not self.vtz_source:
+            self.vtz_source = vtimezone
+            self.vtz_ics = vtimezone.to_ical() if vtimezone else b''
+        ics = getattr(event, 'cached_ics', None)
+        if ics is None:
+            ics = event.cached_ics = event.to_ical()
+        return (b'BEGIN:VCALENDAR\r\n' + ics +
+                self.vtz_ics + b'END:VCALENDAR\r\n')
 
     def sync(self, vtimezone=None):
         r"""Sync with server and rebuild vevent list
+
+        The vevent list is rebuilt only if the sync brought changes
         """
         EtebaseCRUD.sync(self)
-        self.all_events()
+        if self.items_changed:
+            self.all_events()
@@ -53,11 +53,31 @@ class EtesyncInterface (EtesyncCRUD):
         super(EtesyncInterface, self).__init__(
             email, userPassword, remoteUrl,
             uid, authToken, cipher_key, silent)
+        # serialized VTIMEZONE fragment cached by event_to_ics
+        self.vtz_source = None
+        self.vtz_ics = b''
         self.all_events()
 
     def all_events(self):
-        self.events = [Calendar.from_ical(ev).walk('VEVENT')[0]
-                       for ev in EtesyncCRUD.all_events(self)]
+        # Each raw ics string is a full VCALENDAR wrapping one event.
+        # Slice out the VEVENT blocks with str.find (a C substring
+        # scan, far cheaper than iterating lines in Python),
+        # concatenate them and parse the whole calendar once instead
+        # of invoking the parser once per event
+        bodies = []
+        for ics in EtesyncCRUD.all_events(self):
+            i = ics.find('BEGIN:VEVENT')
+            while i >= 0:
+                j = ics.find('END:VEVENT', i)
+                if j < 0:
+                    break
+                nl = ics.find('\n', j)
+                j = len(ics) if nl < 0 else nl + 1
+                bodies.append(ics[i:j])
+                i = ics.find('BEGIN:VEVENT', j)
+        big_ics = ('BEGIN:VCALENDAR\r\n' + ''.join(bodies) +
+                   'END:VCALENDAR\r\n')
+        self.events = Calendar.from_ical(big_ics).walk('VEVENT')
 
     def create_event(self, event, vtimezone=None):
         r"""Create event
@@ -83,16 +103,28 @@ class EtesyncInterface (EtesyncCRUD):
     def event_to_ics(self, event, vtimezone=None):
         r"""Make calendar string (ics) from event
 
+        The same vtimezone is passed on every call, so its
+        serialization is cached and the VCALENDAR wrapper is
+        built by string concatenation instead of constructing
+        and re-serializing a Calendar object per event.
+
         Parameters
         ----------
         event : event to be added (iCalendar object)
         """
-        cal = Calendar()
-        cal.add_component(event)
-        if vtimezone:
-            cal.add_component(vtimezone)
-        ics = cal.to_ical().decode()
-        return ics
+        if vtimezone is not self.vtz_source:
+            self.vtz_source = vtimezone
+            self.vtz_ics = vtimezone.to_ical() if vtimezone else b''
+        # the serialized event is cached on the event object (line
+        # folding in to_ical is pure Python and worth skipping when
+        # the same object is sent again)
+        ics = getattr(event, 'cached_ics', None)
+        if ics is None:
+            ics = event.cached_ics = event.to_ical()
+        # assemble in bytes (to_ical's native type) and decode once
+        # at the end, since the etesync API stores str content
+        return (b'BEGIN:VCALENDAR\r\n' + ics +
+                self.vtz_ics + b'END:VCALENDAR\r\n').decode()
 
     def sync(self, vtimezone=None):
         r"""Sync with server and rebuild vevent list
@@ -1,77 +1,262 @@
-from icalendar import Calendar
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from icalendar import Calendar, Event
 from tempfile import NamedTemporaryFile
 from pathlib import Path
 
+DTSTART_RE = re.compile(rb'^DTSTART[^:\n]*:(\d{8})', re.M)
+UNTIL_RE = re.compile(rb'UNTIL=(\d{8})')
+
+logger = logging.getLogger(__name__)
+
+
+def in_window(block, lo, hi):
+    r"""Whether a raw VEVENT block can have occurrences in lo..hi
+
+    lo and hi are YYYYMMDD byte strings so the comparison stays in
+    text form. Keeps the block when in doubt (no parseable DTSTART,
+    or an open-ended recurrence starting before the window)
+
+    Parameters
+    ----------
+    block : raw bytes of one VEVENT block
+    lo : window start as YYYYMMDD bytes
+    hi : window end as YYYYMMDD bytes
+    """
+    m = DTSTART_RE.search(block)
+    if not m:
+        return True
+    dtstart = m.group(1)
+    if dtstart > hi:
+        return False
+    if dtstart >= lo:
+        return True
+    # starts before the window: keep only if it can recur into it
+    if b'RRULE' in block or b'RDATE' in block:
+        m = UNTIL_RE.search(block)
+        return not (m and m.group(1) < lo)
+    return False
+
+
+def prefilter_ics(text, lo, hi):
+    r"""Drop VEVENT blocks that cannot fall in the date window
+
+    Works on the raw ics bytes so that the dropped events are never
+    decoded or turned into Component objects, which is the dominant
+    startup cost on large calendars
+
+    Parameters
+    ----------
+    text : full ics file as bytes
+    lo : window start as YYYYMMDD bytes
+    hi : window end as YYYYMMDD bytes
+    """
+    out = []
+    pos = 0
+    while True:
+        i = text.find(b'BEGIN:VEVENT', pos)
+        if i < 0:
+            out.append(text[pos:])
+            break
+        j = text.find(b'END:VEVENT', i)
+        if j < 0:
+            out.append(text[pos:])
+            break
+        nl = text.find(b'\n', j)
+        j = len(text) if nl < 0 else nl + 1
+        out.append(text[pos:i])
+        block = text[i:j]
+        if in_window(block, lo, hi):
+            out.append(block)
+        pos = j
+    return b''.join(out)
+
+
+def uid_of(event):
+    r"""Return uid of event, cached on the event object
+
+    Component.decoded re-parses the property on each call; the cached
+    attribute also serves IcalendarInterface.uid, which uses the same
+    attribute name
+    """
+    uid = getattr(event, 'cached_uid', None)
+    if uid is None:
+        uid = event.cached_uid = event.decoded('uid').decode()
+    return uid
+
+
+def check_event(event):
+    r"""Log parse errors; return whether the event is usable"""
+    if event.errors:
+        # the isEnabledFor guard keeps the to_ical re-serialization
+        # of the broken event off the load path when warnings are
+        # suppressed
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "iCalendar error:\n%s while parsing\n%s",
+                event.errors, event.to_ical().decode())
+        return False
+    else:
+        return True
+
+
+def parse_vevents(path, lo=None, hi=None):
+    r"""Parse one ics file and serialize its VEVENTs individually
+
+    Runs in a ProcessPoolExecutor worker: Component objects do not
+    pickle cheaply, so each good VEVENT is returned as ics bytes for
+    the parent to rebuild with a per-event parse
+
+    Parameters
+    ----------
+    path : path of the ics file
+    lo : optional date window start as YYYYMMDD string
+    hi : optional date window end as YYYYMMDD string
+    """
+    with open(path, 'rb') as fp:
+        text = fp.read()
+    if lo:
+        text = prefilter_ics(text, lo, hi)
+    return [ev.to_ical()
+            for ev in Calendar.from_ical(text).walk('VEVENT')
+            if check_event(ev)]
+
 
 class ICSInterface:
-    def __init__(self, filename, backup=False):
+    def __init__(self, filename, backup=False, date_window=None,
+                 durable_sync=False):
         r"""Initialize ICSInterface
 
         Parameters
         ----------
         filename : path to ics file
-        backup: boolean whether to back up old file before overwriting
+        backup: boolean whether to keep the previous file contents
+            (renamed with a trailing ~) when writing
+        durable_sync : boolean whether to fsync the new calendar to
+            storage before it replaces the old file
+        date_window : optional (start, end) pair of dates. Events
+            that cannot occur in this window are skipped at the raw
+            text stage, before parsing. Non-recurring events that
+            start before the window are skipped too, so pad the start
+            if long-running events matter. Implies readonly, because
+            writing back a filtered cache would drop the skipped
+            events.
         """
+        # resolve() costs a stat per path component; opening for read
+        # does not need it, so resolution is deferred until the first
+        # write (and never happens for readonly configurations)
         if isinstance(filename, list):
-            self.filepaths = [Path(f).resolve() for f in filename]
+            self.filepaths = [Path(f) for f in filename]
             self.readonly = True
         else:
-            self.filepaths = [Path(filename).resolve()]
+            self.filepaths = [Path(filename)]
             self.readonly = False
+        self.write_path = None
+        self.date_window = date_window
+        if date_window:
+            self.window_lo = date_window[0].strftime('%Y%m%d').encode()
+            self.window_hi = date_window[1].strftime('%Y%m%d').encode()
+            self.readonly = True
         self.backup = backup
-        self.ics = []
+        self.durable_sync = durable_sync
+        self.ics = b''
+        self.dirty = False
         self.all_events()
 
     def all_events(self):
-        def check_event(event):
-            if event.errors:
-                print("iCalendar error:\n{:} while parsing\n{:}".format(
-                    event.errors, event.to_ical().decode()))
-                return False
-            else:
-                return True
         self.events = []
         self.cache_events = {}
-        filecount = 0
-        for path in self.filepaths:
-            with open(path, 'r') as fp:
-                cal = Calendar.from_ical(fp.read())
-            events = [ev for ev in cal.walk('VEVENT') if check_event(ev)]
-            self.events += events
-            for ev in events:
-                uid = ev.decoded('uid').decode()
-                if len(self.filepaths) > 1:
-                    uid = f"File{filecount}:{uid}"
-                self.cache_events[uid] = ev
-            filecount += 1
+        lo = self.window_lo if self.date_window else None
+        hi = self.window_hi if self.date_window else None
+        if len(self.filepaths) > 1:
+            # icalendar parsing is GIL-bound pure Python, so parse
+            # whole files in worker processes (the reads happen there
+            # too, so they also overlap); the per-event rebuild here
+            # is much lighter than the full-file parse
+            nfiles = len(self.filepaths)
+            with ProcessPoolExecutor(
+                    max_workers=min(8, nfiles)) as pool:
+                per_file = list(pool.map(
+                    parse_vevents, self.filepaths,
+                    [lo] * nfiles, [hi] * nfiles))
+            for filecount, blocks in enumerate(per_file):
+                # format the file prefix once per file, not per event
+                prefix = f"File{filecount}:"
+                events = [Event.from_ical(block) for block in blocks]
+                self.events.extend(events)
+                self.cache_events.update(
+                    {prefix + uid_of(ev): ev for ev in events})
+        else:
+            # read as bytes: icalendar accepts bytes directly, and on
+            # a windowed load the dropped blocks are never decoded
+            with open(self.filepaths[0], 'rb') as fp:
+                text = fp.read()
+            if lo:
+                text = prefilter_ics(text, lo, hi)
+            cal = Calendar.from_ical(text)
+            # validate and index in one pass over the walk instead of
+            # a filtering pass followed by a uid pass
+            events = []
+            for ev in cal.walk('VEVENT'):
+                if check_event(ev):
+                    events.append(ev)
+                    self.cache_events[uid_of(ev)] = ev
+            self.events = events
+
+    def rebuild_from_cache(self):
+        # cache_events holds canonical VEVENT components and is kept
+        # current by the CRUD methods, so rebuilding the event list
+        # after our own sync() needs no reparse of the file we just
+        # wrote; all_events (full parse) is only for initial load
+        self.events = list(self.cache_events.values())
 
     def create_event(self, event, vtimezone=None):
-        uid = event.decoded('uid').decode()
-        self.cache_events[uid] = event
+        self.cache_events[uid_of(event)] = event
+        self.dirty = True
 
     def update_event(self, event, vtimezone=None):
-        uid = event.decoded('uid').decode()
-        self.cache_events[uid] = event
+        self.cache_events[uid_of(event)] = event
+        self.dirty = True
 
     def delete_event(self, uid):
         del self.cache_events[uid]
+        self.dirty = True
 
     def sync(self, vtimezone=None):
-        if self.readonly:
+        if self.readonly or not self.dirty:
             return
-        if self.backup:
-            with NamedTemporaryFile(mode='w',
-                                    suffix=self.filepaths[0].suffix,
-                                    prefix=self.filepaths[0].name,
-                                    dir=self.filepaths[0].parent,
-                                    delete=False) as fp:
-                fp.write(self.ics)
-        cal = Calendar()
+        if self.write_path is None:
+            self.write_path = self.filepaths[0].resolve()
+        # serialize each event once and cache the bytes on the event
+        # object, so later syncs re-serialize only events that were
+        # replaced since the last write
+        parts = [b'BEGIN:VCALENDAR\r\n']
         for event in self.cache_events.values():
-            cal.add_component(event)
+            ics = getattr(event, 'cached_ics', None)
+            if ics is None:
+                ics = event.cached_ics = event.to_ical()
+            parts.append(ics)
         if vtimezone:
-            cal.add_component(vtimezone)
-        self.ics = cal.to_ical().decode()
-        with open(self.filepaths[0], 'w') as fp:
+            parts.append(vtimezone.to_ical())
+        parts.append(b'END:VCALENDAR\r\n')
+        self.ics = b''.join(parts)
+        # write to a temporary file in the same directory and move it
+        # into place with os.replace (an atomic rename), so a crash
+        # mid-write can never leave a truncated calendar behind
+        with NamedTemporaryFile(mode='wb',
+                                suffix=self.write_path.suffix,
+                                prefix=self.write_path.name,
+                                dir=self.write_path.parent,
+                                delete=False) as fp:
             fp.write(self.ics)
-        self.all_events()
+            if self.durable_sync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        if self.backup:
+            os.replace(self.write_path, self.write_path.with_name(
+                self.write_path.name + '~'))
+        os.replace(fp.name, self.write_path)
+        self.rebuild_from_cache()
+        self.dirty = False
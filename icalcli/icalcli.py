@@ -33,25 +33,37 @@
 # These are standard libraries and should never fail
 import sys
 import re
-from os.path import expanduser
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from concurrent.futures import ThreadPoolExecutor
+from os.path import expanduser, getmtime
 import textwrap
 import signal
 from datetime import datetime, timedelta, date
 from unicodedata import east_asian_width
 from collections import namedtuple
+from functools import lru_cache
 from socket import gethostname
-import importlib.util
+from time import monotonic
 import shlex
 import readline  # noqa: F401
+try:
+    # optional: RE2 matches in linear time, so adversarial patterns
+    # (catastrophic backtracking) cannot hang delete/edit searches
+    import re2
+except ImportError:
+    re2 = None
 from traceback import print_exc
-from difflib import unified_diff
 
 # Required 3rd party libraries
+# (recurring_ical_events and difflib are imported lazily at first
+# use: recurrence expansion and the raw-ics diff are not needed on
+# every startup and their imports are a measurable share of the CLI
+# cold-start)
 try:
     from icalendar import Event, Alarm, Calendar
     from icalendar.prop import TypesFactory
     from dateutil.tz import tzlocal, UTC, gettz
-    import recurring_ical_events
 except ImportError as exc:  # pragma: no cover
     print("ERROR: Missing module - %s" % exc.args[0])
     sys.exit(1)
@@ -62,9 +74,16 @@ except ImportError as exc:  # pragma: no cover
 from icalcli import utils
 from icalcli.argparsers import get_argument_parser, get_add_parser
 from icalcli.utils import _u  # , days_since_epoch
-from icalcli.printer import Printer
+from icalcli.printer import Printer, ART_CHARS
 
 EventTitle = namedtuple('EventTitle', ['title', 'color'])
+# constructing dateutil's tzlocal re-inspects the system timezone on
+# every call; one instance serves the whole session
+LOCAL_TZ = tzlocal()
+# strips VALARM blocks from serialized events (--noalarm edits); the
+# non-greedy body matches each block separately, so an event with
+# several alarms keeps the properties between them
+VALARM_RE = re.compile(r'BEGIN:VALARM.*?END:VALARM\s*', re.DOTALL)
 CalName = namedtuple('CalName', ['name', 'color'])
 ALL_EVENTS = 0
 RECURRING_EVENTS = 1
@@ -86,6 +105,65 @@ Event.Decoded = safe_decode
 Alarm.Decoded = safe_decode
 
 
+@lru_cache(maxsize=16)
+def grid_strings(cal_width, days, art_style):
+    r"""Divider and padding strings for the calendar grid
+
+    These depend only on the cell width, the number of day columns
+    and the line-art style, which rarely change within a session, so
+    repeated renders in the REPL reuse the same strings
+
+    Parameters
+    ----------
+    cal_width : int (width of one day cell)
+    days : int (number of day columns)
+    art_style : string (key into printer.ART_CHARS)
+
+    Returns
+    -------
+    (week_top, week_divider, week_bottom, month_title_top,
+     month_title_bottom, empty_day) tuple of strings
+    """
+    art = ART_CHARS[art_style]
+    day_width_line = cal_width * art['hrz']
+
+    def divider(left, center, right):
+        return ''.join(
+            (art[left], day_width_line) +
+            (days - 1) * (art[center], day_width_line) +
+            (art[right],))
+
+    return (divider('ulc', 'ute', 'urc'),
+            divider('lte', 'crs', 'rte'),
+            divider('llc', 'bte', 'lrc'),
+            divider('ulc', 'hrz', 'urc'),
+            divider('lte', 'ute', 'rte'),
+            cal_width * ' ')
+
+
+@lru_cache(maxsize=8)
+def box_markers(indent, width, art_style):
+    r"""Top and bottom borders of the description box in PrintEvent
+
+    Identical for every event at a given output width, so built once
+    instead of per printed description
+
+    Parameters
+    ----------
+    indent : string (left padding of the box)
+    width : int (total output width)
+    art_style : string (key into printer.ART_CHARS)
+
+    Returns
+    -------
+    (top, bottom) tuple of strings
+    """
+    art = ART_CHARS[art_style]
+    hrz = art['hrz'] * (width - len(indent) - 2)
+    return (indent + art['ulc'] + hrz + art['urc'],
+            indent + art['llc'] + hrz + art['lrc'])
+
+
 class IcalendarInterface:
 
     cache = {}
@@ -93,6 +171,12 @@ class IcalendarInterface:
     allEvents = []
 
     UNIWIDTH = {'W': 2, 'F': 2, 'N': 1, 'Na': 1, 'H': 1, 'A': 1}
+    # per-character printed widths, filled lazily by printed_len
+    CHAR_WIDTH = {}
+    # shared description wrapper: constructing a TextWrapper compiles
+    # its word-splitting regexes, so PrintEvent reconfigures this one
+    # instead of building one per description line
+    WRAPPER = textwrap.TextWrapper()
     backend_cache_dirty = False
     default_outputs = ['end', 'alarms', 'freebusy', 'location']
     default_graphical_outputs = ['end', 'alarms']
@@ -125,6 +209,12 @@ class IcalendarInterface:
         options : dict of command options
         """
         self.options = options
+        # weekday number -> calendar column, resolved once per
+        # command; cal_monday would otherwise test the same options
+        # for every event placed on the grid. The flags only exist
+        # for the calendar commands, the sole users of the map
+        if 'cal_monday' in options and 'cal_weekend' in options:
+            self.wd_map = [self.cal_monday(d) for d in range(7)]
         self.set_now()  # set self.now
         self.outputs = options.get('outputs', {})
         for key in self.default_outputs:
@@ -138,7 +228,8 @@ class IcalendarInterface:
     def set_now(self):
         # This command is run at initiaization, but it should also be
         # run frequently to prevent self.now from becoming stale
-        self.now = datetime.now(tzlocal())
+        self.now = datetime.now(LOCAL_TZ)
+        self.now_set_at = monotonic()
 
         def offset(now, years):
             d = int(365.25 * years) + (1 if years > 0 else -1)
@@ -151,15 +242,26 @@ class IcalendarInterface:
 
     @staticmethod
     def uid(event):
-        """Return uid of event"""
-        return event.Decoded('uid').decode()
+        """Return uid of event, cached on the event object"""
+        uid = getattr(event, 'cached_uid', None)
+        if uid is None:
+            uid = event.cached_uid = event.Decoded('uid').decode()
+        return uid
 
     def check_duplicate_uids(self):
         # fixes https://github.com/jrvarma/icalcli/pull/8#issue-1310596831
-        if len(set(self.uid(e) for e in self.events)) < len(self.events):
-            # list to dict to list is a one-liner dedup
-            self.events = list(
-                {self.uid(e): e for e in self.events}.values())
+        # one pass builds the dedup dict and detects duplicates at
+        # the same time (the old set-then-dict version decoded every
+        # uid twice when duplicates were present)
+        seen = {}
+        duplicates = False
+        for e in self.events:
+            u = self.uid(e)
+            if u in seen:
+                duplicates = True
+            seen[u] = e
+        if duplicates:
+            self.events = list(seen.values())
             self.readonly = True
             self.printer.err_msg('Duplicate UIDs found. '
                                  'Calendar deduplicated and set to readonly\n')
@@ -173,15 +275,36 @@ class IcalendarInterface:
             self.readonly = False
 
     def setup_recurring_events(self):
-        self.recur_uids = set(self.uid(e) for e in self.events
-                              if 'RRULE' in e or 'RDATE' in e)
+        self.recur_uids = frozenset(
+            self.uid(e) for e in self.events
+            if 'RRULE' in e or 'RDATE' in e)
+        # uid -> event, so selecting events by uid needs no scan of
+        # the whole list; delete keeps it current within a session
+        self.event_by_uid = {self.uid(e): e for e in self.events}
+        # temporal index: events sorted by start let a date-window
+        # search bisect its candidates instead of scanning the whole
+        # calendar; max_event_span bounds how far before the window
+        # an event can start and still reach into it
+        self.events_by_start = sorted(
+            self.events, key=lambda e: self.decode_dtm(e, 'dtstart'))
+        self.event_starts = [self.decode_dtm(e, 'dtstart')
+                             for e in self.events_by_start]
+        spans = [self.decode_dtm(e, 'dtend') - s
+                 for e, s in zip(self.events_by_start,
+                                 self.event_starts)
+                 if 'dtend' in e or 'duration' in e]
+        self.max_event_span = max(spans, default=timedelta(0))
         if self.recur_uids:
+            import recurring_ical_events
+            # hand the existing event components to
+            # recurring_ical_events directly: serializing the whole
+            # calendar and parsing it back only produced an
+            # equivalent copy at O(total ical bytes) cost, and the
+            # expansion copies each occurrence it returns anyway
             cal = Calendar()
-            ics_list = []
             for event in self.events:
                 cal.add_component(event)
-            ics_list += [cal.to_ical().decode()]
-            self.calendar = Calendar.from_ical("".join(ics_list))
+            self.calendar = cal
             self.recurring_events = recurring_ical_events.of(
                 self.calendar, keep_recurrence_attributes=True)
 
@@ -200,9 +323,9 @@ class IcalendarInterface:
         if not hasattr(dt, 'tzinfo'):  # skip dates
             return dt
         if dt.tzinfo is None:
-            return dt.replace(tzinfo=tzlocal())
+            return dt.replace(tzinfo=LOCAL_TZ)
         else:
-            return dt.astimezone(tzlocal())
+            return dt.astimezone(LOCAL_TZ)
 
     @staticmethod
     def confirm(prompt):
@@ -238,17 +361,45 @@ class IcalendarInterface:
         Returns
         -------
         datetime (timezone aware)
+
+        The converted datetime is cached on the event object keyed by
+        field: rendering decodes dtstart/dtend of the same event many
+        times per command and Decoded plus astimezone dominate that
+        path. Edits replace event objects rather than mutating them,
+        so the cache cannot go stale.
         """
-        if field not in event and field == 'dtend':
-            d = event.Decoded('dtstart') + event.Decoded('duration')
-        else:
-            d = event.Decoded(field)
-        if isinstance(d, datetime):
-            return IcalendarInterface.display_timezone(d)
-        else:
-            return IcalendarInterface.display_timezone(
-                datetime.combine(
-                    d, datetime.min.time()))
+        cache = getattr(event, 'dtm_cache', None)
+        if cache is None:
+            cache = event.dtm_cache = {}
+        dtm = cache.get(field)
+        if dtm is None:
+            if field not in event and field == 'dtend':
+                d = event.Decoded('dtstart') + event.Decoded('duration')
+            else:
+                d = event.Decoded(field)
+            if not isinstance(d, datetime):
+                d = datetime.combine(d, datetime.min.time())
+            dtm = cache[field] = IcalendarInterface.display_timezone(d)
+        return dtm
+
+    @staticmethod
+    def summary_text(event):
+        r"""Decoded summary text, cached on the event object
+
+        Parameters
+        ----------
+        event : icalendar Event
+
+        Returns
+        -------
+        string, or None if the event has no summary
+        """
+        s = getattr(event, 'cached_summary', False)
+        if s is False:
+            s = event.cached_summary = (
+                event.Decoded('summary').decode()
+                if 'summary' in event else None)
+        return s
 
     def valid_title(self, event):
         r"""Return summary of event
@@ -261,9 +412,9 @@ class IcalendarInterface:
         -------
         string
         """
-        if 'summary' in event and (
-                event.Decoded('summary').decode().strip()):
-            return event.Decoded('summary').decode()
+        s = self.summary_text(event)
+        if s and s.strip():
+            return s
         else:
             return "(No title)"
 
@@ -278,10 +429,70 @@ class IcalendarInterface:
         -------
         boolean
         """
-        return (self.decode_dtm(event, 'dtstart').hour == 0 and
-                self.decode_dtm(event, 'dtstart').minute == 0 and
-                self.decode_dtm(event, 'dtend').hour == 0 and
-                self.decode_dtm(event, 'dtend').minute == 0)
+        allday = getattr(event, 'cached_allday', None)
+        if allday is None:
+            start = self.decode_dtm(event, 'dtstart')
+            if start.hour or start.minute:
+                # a mid-day start settles it without decoding dtend
+                allday = False
+            else:
+                end = self.decode_dtm(event, 'dtend')
+                allday = end.hour == 0 and end.minute == 0
+            event.cached_allday = allday
+        return allday
+
+    @staticmethod
+    def alarm_minutes(event):
+        r"""Minutes before start of the event's first alarm
+
+        walk('valarm') traverses the whole component and the result
+        never changes for a given event object, so it is computed
+        once and cached on the event (the scheme used for uids and
+        decoded datetimes)
+
+        Parameters
+        ----------
+        event : icalendar Event
+
+        Returns
+        -------
+        None if there is no alarm, the string '??' if the trigger is
+        not a timedelta, otherwise minutes as a float
+        """
+        minutes = getattr(event, 'cached_alarm', False)
+        if minutes is False:
+            alarms = event.walk('valarm')
+            if not alarms:
+                minutes = None
+            else:
+                trigger = alarms[0].Decoded('trigger')
+                if isinstance(trigger, timedelta):
+                    minutes = -trigger.total_seconds() / 60
+                else:
+                    minutes = '??'
+            event.cached_alarm = minutes
+        return minutes
+
+    @staticmethod
+    def is_free(event):
+        r"""Whether the event is marked free (transp TRANSPARENT)
+
+        Cached on the event object like alarm_minutes
+
+        Parameters
+        ----------
+        event : icalendar Event
+
+        Returns
+        -------
+        boolean
+        """
+        free = getattr(event, 'cached_free', None)
+        if free is None:
+            free = event.cached_free = (
+                'transp' in event and
+                event.Decoded('transp').decode() == 'TRANSPARENT')
+        return free
 
     def cal_monday(self, day_num):
         r"""Shift the day number if week should start on Monday
@@ -348,13 +559,11 @@ class IcalendarInterface:
         string
         """
         def fmt_time(field):
+            dt = self.decode_dtm(event, field)
             if self.options['military']:
-                return self.decode_dtm(event, field).strftime("%H:%M")
+                return dt.strftime("%H:%M")
             else:
-                return (
-                    self.decode_dtm(event, field).strftime("%I:%M")
-                    .lstrip('0') +
-                    self.decode_dtm(event, field).strftime('%p') .lower())
+                return dt.strftime("%I:%M%p").lstrip('0').lower()
         titlestr = self.valid_title(event)
         if allday:
             summary = titlestr
@@ -364,44 +573,67 @@ class IcalendarInterface:
                 tm += " - " + fmt_time('dtend')
             summary = tm + " " + titlestr
         if self.graphical_outputs.get('alarms'):
-            alarms = event.walk('valarm')
-            if alarms:
-                if isinstance(alarms[0].Decoded('trigger'), timedelta):
-                    minutes = -(alarms[0].Decoded('trigger')
-                                .total_seconds()/60)
-                    summary += ' AL:%.0fm' % minutes
-                else:
-                    summary += ' AL: ??'
+            minutes = self.alarm_minutes(event)
+            if minutes == '??':
+                summary += ' AL: ??'
+            elif minutes is not None:
+                summary += ' AL:%.0fm' % minutes
         if self.graphical_outputs.get('freebusy'):
-            free = ('transp' in event and
-                    event.Decoded('transp').decode() == 'TRANSPARENT')
-            summary += (' free ' if free else ' busy ')
-        if (
-                self.graphical_outputs.get('location')
-                and 'location' in event
-                and event.Decoded('location').decode().strip()
-        ):
-            summary += " [%s]" % (event.Decoded('location').
-                                  decode().strip())
+            summary += (' free ' if self.is_free(event) else ' busy ')
+        if self.graphical_outputs.get('location'):
+            location = self.field_str(event, 'location')
+            if location and location.strip():
+                summary += " [%s]" % location.strip()
         if self.graphical_outputs.get('uid'):
-            summary += " <%s>" % (event.Decoded('uid').decode().strip())
+            summary += " <%s>" % self.uid(event).strip()
         if (
                 self.graphical_outputs.get('description')
-                and 'description' in event
-                and event.Decoded('description').decode().strip()
                 and self.outputs.get('description')
         ):
-            summary += event.Decoded('description'). decode().strip()
+            descr = self.field_str(event, 'description')
+            if descr and descr.strip():
+                summary += descr.strip()
         return summary
 
-    def get_week_events(self, start_dt, end_dt, event_list):
+    def build_event_index(self, event_list):
+        r"""Precompute the per-event fields used by the week loops
+
+        GraphEvents calls get_week_events once per displayed week and
+        each call used to re-decode dtstart/dtend and re-derive the
+        day number and allday flag for every event; computing them
+        once here turns the inner week loop into tuple unpacking
+
+        Parameters
+        ----------
+        event_list : list of icalendar events
+
+        Returns
+        -------
+        list of (start, end, daynum, allday, event) tuples
+        """
+        index = []
+        for event in event_list:
+            start = self.decode_dtm(event, 'dtstart')
+            end = self.decode_dtm(event, 'dtend')
+            allday = self.isallday(event)
+            if allday:
+                # NOTE(slwaqo): in allDay events end date is always
+                # set as day+1 and hour 0:00
+                # So to not display it one day more, it's
+                # necessary to lower it by one day
+                end -= timedelta(days=1)
+            daynum = self.wd_map[start.isoweekday() % 7]
+            index.append((start, end, daynum, allday, event))
+        return index
+
+    def get_week_events(self, start_dt, end_dt, event_index):
         r"""Returns all events during a week (start_dt to end_dt)
 
         Parameters
         ----------
         start_dt : datetime
         end_dt : datetime
-        event_list : list of icalendar events
+        event_index : list of tuples from build_event_index
 
         Returns
         -------
@@ -410,31 +642,21 @@ class IcalendarInterface:
         """
         week_events = [[] for _ in range(7)]
 
-        to_show_now = True
-        if self.now < start_dt or self.now > end_dt:
-            to_show_now = False
-        now_daynum = self.cal_monday(int(self.now.strftime("%w")))
+        # the now marker can only fall in the week containing
+        # self.now, so every other week skips its setup entirely
+        to_show_now = start_dt <= self.now <= end_dt
+        if to_show_now:
+            now_daynum = self.wd_map[self.now.isoweekday() % 7]
 
-        for event in event_list:
-            event_daynum = self.cal_monday(int(self.decode_dtm(
-                event, 'dtstart').strftime("%w")))
-            event_allday = self.isallday(event)
+        for (event_start_date, event_end_date, event_daynum,
+                event_allday, event) in event_index:
+            # event_time_in_range / event_spans_time inlined as
+            # chained comparisons: a method call per event per week
+            # costs more than the tests themselves
+            event_is_today = start_dt <= event_start_date < end_dt
 
-            event_end_date = self.decode_dtm(event, 'dtend')
-            event_start_date = self.decode_dtm(event, 'dtstart')
-            if event_allday:
-                # NOTE(slwaqo): in allDay events end date is always
-                # set as day+1 and hour 0:00
-                # So to not display it one day more, it's
-                # necessary to lower it by one day
-                event_end_date -= timedelta(days=1)
-
-            event_is_today = self.event_time_in_range(
-                event_start_date, start_dt, end_dt)
-
-            event_continues_today = self.event_spans_time(
-                event_start_date, event_end_date,
-                start_dt)
+            event_continues_today = (
+                event_start_date < start_dt <= event_end_date)
 
             # NOTE(slawqo): it's necessary to process events which
             # starts in current period of time
@@ -481,8 +703,8 @@ class IcalendarInterface:
                     if event_end_date >= end_dt:
                         end_daynum = 6
                     else:
-                        end_daynum = self.cal_monday(int(
-                            event_end_date.strftime("%w")))
+                        end_daynum = self.wd_map[
+                            event_end_date.isoweekday() % 7]
                     if event_start_date < start_dt:
                         start_daynum = 0
                     else:
@@ -507,6 +729,10 @@ class IcalendarInterface:
         so we convert them to unicode and then check their size.
         Fixes the output issues around non-US locale strings
 
+        ASCII characters are always one column wide, so the common
+        all-ASCII case is just len(); other characters get their
+        east_asian_width looked up once and cached
+
         Parameters
         ----------
         string : string
@@ -515,9 +741,36 @@ class IcalendarInterface:
         -------
         int : printed length
         """
-        return sum(
-                self.UNIWIDTH[east_asian_width(char)] for char in _u(
-                    string))
+        string = _u(string)
+        if string.isascii():
+            return len(string)
+        total = 0
+        widths = self.CHAR_WIDTH
+        for char in string:
+            w = widths.get(char)
+            if w is None:
+                w = widths[char] = self.UNIWIDTH[east_asian_width(char)]
+            total += w
+        return total
+
+    def pad(self, string, width):
+        r"""Pad string with spaces to a printed width
+
+        A single C-level ljust; the target is adjusted by the
+        difference between character and printed length, which is
+        zero for ASCII labels
+
+        Parameters
+        ----------
+        string : string
+        width : int (printed width to pad to)
+
+        Returns
+        -------
+        string
+        """
+        return string.ljust(width - self.printed_len(string)
+                            + len(string))
 
     def word_cut(self, word):
         r"""Where to cut word to fit into cal_width
@@ -530,10 +783,18 @@ class IcalendarInterface:
         -------
         int: where to cut the word
         """
+        cal_width = self.options['cal_width']
+        widths = self.CHAR_WIDTH
         stop = 0
         for i, char in enumerate(word):
-            stop += self.printed_len(char)
-            if stop >= self.options['cal_width']:
+            # accumulate from the width cache directly; a
+            # printed_len call per character costs more than the
+            # lookup it wraps
+            w = widths.get(char)
+            if w is None:
+                w = widths[char] = self.UNIWIDTH[east_asian_width(char)]
+            stop += w
+            if stop >= cal_width:
                 return stop, i + 1
 
     def next_cut(self, string, cur_print_len):
@@ -551,24 +812,26 @@ class IcalendarInterface:
         -------
         int: where to cut the word
         """
-        # print_len = 0
-
+        cal_width = self.options['cal_width']
         words = _u(string).split()
+        # running printed width and character length of the words
+        # accepted so far (including separating spaces), instead of
+        # re-joining and re-measuring the prefix for every word
+        print_len = 0
+        cut_idx = 0
         for i, word in enumerate(words):
-            print_len = self.printed_len(' '.join(words[:i]))
             word_len = self.printed_len(word)
-            if (
-                    (cur_print_len + word_len + print_len
-                     ) >= self.options['cal_width']
-            ):
-                cut_idx = len(' '.join(words[:i]))
+            if (cur_print_len + word_len + print_len) >= cal_width:
                 # if the  word is too long,
                 # we cannot cut between words
                 if cut_idx == 0:
                     return self.word_cut(word)
                 return (print_len, cut_idx)
-            # print_len += word_len + i  # +i for the space between words
-        return (print_len, len(' '.join(words[:i])))
+            last_print_len, last_cut_idx = print_len, cut_idx
+            sep = 1 if i else 0
+            print_len += word_len + sep
+            cut_idx += len(word) + sep
+        return (last_print_len, last_cut_idx)
 
     def get_cut_index(self, event_string):
         r"""Cut string at line break, between words or within word
@@ -582,15 +845,34 @@ class IcalendarInterface:
         -------
         int: where to cut
         """
+        cal_width = self.options['cal_width']
+
+        if event_string.isascii():
+            # pure-ASCII titles (the common case): printed length is
+            # just len() and the cut point is the last space that
+            # fits, found with C-level str.rfind instead of the
+            # per-word measuring loop in next_cut
+            idx = event_string.find('\n')
+            if -1 < idx <= cal_width:
+                return (idx, idx)
+            n = len(event_string)
+            if n <= cal_width:
+                return (n, n)
+            cut = event_string.rfind(' ', 0, cal_width + 1)
+            if cut <= 0:
+                # a single word longer than the cell: hard cut
+                return (cal_width, cal_width)
+            return (cut, cut)
+
         print_len = self.printed_len(event_string)
 
         # newline in string is a special case
         idx = event_string.find('\n')
-        if idx > -1 and idx <= self.options['cal_width']:
+        if idx > -1 and idx <= cal_width:
             return (self.printed_len(event_string[:idx]),
                     len(event_string[:idx]))
 
-        if print_len <= self.options['cal_width']:
+        if print_len <= cal_width:
             return (print_len, len(event_string))
 
         else:
@@ -610,6 +892,7 @@ class IcalendarInterface:
         """
 
         color_border = self.options['color_border']
+        cal_width = self.options['cal_width']
 
         # # ignore started events (i.e. events that start
         # # previous day and end start day)
@@ -618,8 +901,6 @@ class IcalendarInterface:
         #        < startDateTime):
         #     eventList = eventList[1:]
 
-        day_width_line = self.options['cal_width'] * self.printer.art[
-            'hrz']
         days = 7 if self.options['cal_weekend'] else 5
         # Get the localized day names... January 1, 2001 was a Monday
         day_names = ([date(2001, 1, i + 1).strftime('%A')
@@ -628,34 +909,22 @@ class IcalendarInterface:
                 'cal_weekend']:
             day_names = day_names[6:] + day_names[:6]
 
-        def build_divider(left, center, right):
-            return (
-                self.printer.art[left] + day_width_line +
-                ((days - 1) * (self.printer.art[center]
-                               + day_width_line)) +
-                self.printer.art[right])
-
-        week_top = build_divider('ulc', 'ute', 'urc')
-        week_divider = build_divider('lte', 'crs', 'rte')
-        week_bottom = build_divider('llc', 'bte', 'lrc')
-        empty_day = self.options['cal_width'] * ' '
+        (week_top, week_divider, week_bottom, month_title_top,
+         month_title_bottom, empty_day) = grid_strings(
+            cal_width, days, self.printer.art_style)
 
         if cmd == 'calm':
             # month titlebar
-            month_title_top = build_divider('ulc', 'hrz', 'urc')
             self.printer.msg(month_title_top + '\n', color_border)
 
             month_title = startDateTime.strftime('%B %Y')
-            month_width = (self.options['cal_width'] * days) + (
-                days - 1)
-            month_title += ' ' * (month_width
-                                  - self.printed_len(month_title))
+            month_width = (cal_width * days) + (days - 1)
+            month_title = self.pad(month_title, month_width)
 
             self.printer.art_msg('vrt', color_border)
             self.printer.msg(month_title, self.options['color_date'])
             self.printer.art_msg('vrt', color_border)
 
-            month_title_bottom = build_divider('lte', 'ute', 'rte')
             self.printer.msg('\n' + month_title_bottom + '\n',
                              color_border)
         else:
@@ -666,58 +935,75 @@ class IcalendarInterface:
         # weekday labels
         self.printer.art_msg('vrt', color_border)
         for day_name in day_names:
-            day_name += ' ' * (
-                    self.options['cal_width'] - self.printed_len(
-                        day_name))
+            day_name = self.pad(day_name, cal_width)
 
             self.printer.msg(day_name, self.options['color_date'])
             self.printer.art_msg('vrt', color_border)
 
         self.printer.msg('\n' + week_divider + '\n', color_border)
-        cur_month = startDateTime.strftime("%b")
+        cur_month = startDateTime.month
+        now_ord = self.now.toordinal()
+        # localized month abbreviations: one strftime per month here
+        # instead of one per displayed cell below
+        month_names = [date(2001, m, 1).strftime('%b')
+                       for m in range(1, 13)]
 
         # get date range objects for the first week
         if cmd == 'calm':
-            day_num = self.cal_monday(
-                int(startDateTime.strftime("%w")))
+            day_num = self.wd_map[
+                startDateTime.isoweekday() % 7]
             startDateTime = (startDateTime - timedelta(days=day_num))
         startWeekDateTime = startDateTime
         endWeekDateTime = (startWeekDateTime + timedelta(days=7))
 
+        event_index = self.build_event_index(eventList)
+        # search_for_events returns events sorted by start, so each
+        # week's candidates are a bisect slice of the index instead
+        # of a scan of every event per week; all-day events that
+        # start earlier but span into the week are kept separately
+        starts = [entry[0] for entry in event_index]
+        multiday = [entry for entry in event_index
+                    if entry[3] and entry[1] > entry[0]]
+
+        vrt = self.printer.art['vrt']
+
         for i in range(count):
             # create and print the date line for a week
+            # rows are accumulated as (text, color) runs and emitted
+            # with one stream write per line instead of one write per
+            # cell fragment
+            row = []
             for j in range(days):
+                cell = startWeekDateTime + timedelta(days=j)
                 if cmd in ('calw', 'cal5w'):
-                    d = (startWeekDateTime +
-                         timedelta(days=j)).strftime("%d %b")
+                    d = f"{cell.day:02d} {month_names[cell.month - 1]}"
                 else:  # (cmd == 'calm'):
-                    d = (startWeekDateTime +
-                         timedelta(days=j)).strftime("%d")
-                    if cur_month != (startWeekDateTime +
-                                     timedelta(days=j)).strftime("%b"):
+                    d = f"{cell.day:02d}"
+                    if cur_month != cell.month:
                         d = ''
                 tmpDateColor = self.options['color_date']
 
-                if (
-                        self.now.strftime("%d%b%Y") == (
-                            (startWeekDateTime + timedelta(days=j))
-                            .strftime("%d%b%Y"))
-                ):
+                if cell.toordinal() == now_ord:
                     tmpDateColor = self.options['color_now_marker']
                     d += " **"
 
-                d += ' ' * (self.options['cal_width']
-                            - self.printed_len(d))
+                d = self.pad(d, cal_width)
 
-                # print dates
-                self.printer.art_msg('vrt', color_border)
-                self.printer.msg(d, tmpDateColor)
+                row.append((vrt, color_border))
+                row.append((d, tmpDateColor))
 
-            self.printer.art_msg('vrt', color_border)
-            self.printer.msg('\n')
+            row.append((vrt, color_border))
+            row.append(('\n', 'default'))
+            self.printer.msg_runs(row)
 
+            candidates = [entry for entry in multiday
+                          if entry[0] < startWeekDateTime
+                          and entry[1] >= startWeekDateTime]
+            candidates += event_index[
+                bisect_left(starts, startWeekDateTime):
+                bisect_left(starts, endWeekDateTime)]
             week_events = self.get_week_events(
-                    startWeekDateTime, endWeekDateTime, eventList)
+                    startWeekDateTime, endWeekDateTime, candidates)
 
             # get date range objects for the next week
             startWeekDateTime = endWeekDateTime
@@ -728,23 +1014,19 @@ class IcalendarInterface:
                 # printing one line at a time
                 # stop when everything has been printed
                 done = True
-                self.printer.art_msg('vrt', color_border)
+                row = [(vrt, color_border)]
                 for j in range(days):
                     if not week_events[j]:
                         # no events today
-                        self.printer.msg(
-                                empty_day + self.printer.art['vrt'],
-                                color_border)
+                        row.append((empty_day + vrt, color_border))
                         continue
 
                     curr_event = week_events[j][0]
                     print_len, cut_idx = self.get_cut_index(
                         curr_event.title)
-                    padding = ' ' * (self.options['cal_width']
-                                     - print_len)
-                    self.printer.msg(
-                            curr_event.title[:cut_idx] + padding,
-                            curr_event.color)
+                    padding = ' ' * (cal_width - print_len)
+                    row.append((curr_event.title[:cut_idx] + padding,
+                                curr_event.color))
 
                     # trim what we've already printed
                     trimmed_title = curr_event.title[cut_idx:].strip()
@@ -756,13 +1038,14 @@ class IcalendarInterface:
                             title=trimmed_title)
 
                     done = False
-                    self.printer.art_msg('vrt', color_border)
+                    row.append((vrt, color_border))
 
-                self.printer.msg('\n')
+                row.append(('\n', 'default'))
+                self.printer.msg_runs(row)
                 if done:
                     break
 
-            if i < range(count)[len(range(count)) - 1]:
+            if i < count - 1:
                 self.printer.msg(week_divider + '\n', color_border)
             else:
                 self.printer.msg(week_bottom + '\n', color_border)
@@ -776,39 +1059,41 @@ class IcalendarInterface:
         prefix : string (for example, indent before event)
         """
 
-        def formatDescr(descr, indent, box):
-            wrapper = textwrap.TextWrapper()
+        def formatDescr(descr, indent, box, width):
+            # width and the border glyph are resolved once here, not
+            # once per wrapped line
+            wrapper = self.WRAPPER
+            vrt = self.printer.art['vrt']
+            cut = len(indent)
             if box:
                 wrapper.initial_indent = (indent + '  ')
                 wrapper.subsequent_indent = (indent + '  ')
-                wrapper.width = (self.outputs.get('width') - 2)
+                wrapper.width = (width - 2)
             else:
                 wrapper.initial_indent = indent
                 wrapper.subsequent_indent = indent
-                wrapper.width = self.outputs.get('width')
+                wrapper.width = width
             new_descr = ""
-            for line in descr.split("\n"):
+            for line in descr.splitlines():
                 if box:
                     tmpLine = wrapper.fill(line)
-                    for singleLine in tmpLine.split("\n"):
-                        singleLine = singleLine.ljust(
-                                self.outputs.get('width'), ' ')
-                        new_descr += (singleLine[:len(indent)] +
-                                      self.printer.art['vrt'] +
-                                      singleLine[
-                                          (len(indent) + 1):
-                                          (self.outputs.get('width')
-                                           - 1)]
-                                      + self.printer.art['vrt'] + '\n')
+                    for singleLine in tmpLine.splitlines():
+                        singleLine = singleLine.ljust(width, ' ')
+                        new_descr += (singleLine[:cut] + vrt +
+                                      singleLine[(cut + 1):(width - 1)]
+                                      + vrt + '\n')
                 else:
                     new_descr += wrapper.fill(line) + "\n"
             return new_descr.rstrip()
 
         indent = 12 * ' '
         outputsIndent = 19 * ' '
+        # bind the per-event dict lookups once
+        outputs = self.outputs
+        military = self.options['military']
 
         def time_format(tm):
-            if self.options['military']:
+            if military:
                 timeFormat = '%-5s'
                 tmpTimeStr = tm.strftime("%H:%M")
             else:
@@ -819,7 +1104,7 @@ class IcalendarInterface:
             return timeFormat, tmpTimeStr
 
         def date_format(tm):
-            if self.options['military']:
+            if military:
                 dateFormat = '%-5s'
                 tmpDateStr = tm.strftime("%d-%m")
             else:
@@ -830,7 +1115,10 @@ class IcalendarInterface:
         if not prefix:
             prefix = indent
 
-        self.printer.msg(prefix, self.options['color_date'])
+        # accumulate the event as (text, color) runs and emit them
+        # with one stream write; per-fragment msg calls add up when
+        # listings run to thousands of events
+        row = [(prefix, self.options['color_date'])]
 
         happeningNow = (self.decode_dtm(event, 'dtstart')
                         <= self.now
@@ -843,100 +1131,81 @@ class IcalendarInterface:
         timeFormat, tmpTimeStr = time_format(self.decode_dtm(
             event, 'dtstart'))
         if ev_type == ORIGINAL_OF_RECURRING_EVENTS:
-            if self.options['military']:
+            if military:
                 fmt = '     %10s'  # matches ' ', ' to ', 5 char date & time
             else:
                 fmt = '     %14s'  # matches ' ', ' to ', 7 char date & time
-            self.printer.msg(fmt % 'Recurs', eventColor)
+            row.append((fmt % 'Recurs', eventColor))
         elif allDay:
             fmt = ' ' + timeFormat
-            self.printer.msg(fmt % '', eventColor)
-            if self.outputs.get('end'):
+            row.append((fmt % '', eventColor))
+            if outputs.get('end'):
                 dateFormat, tmpDateStr = date_format(
                     self.decode_dtm(event, 'dtend'))
                 fmt = ' to ' + dateFormat
-                self.printer.msg(fmt % tmpDateStr, eventColor)
+                row.append((fmt % tmpDateStr, eventColor))
         else:
             fmt = ' ' + timeFormat
-            self.printer.msg(fmt % tmpTimeStr, eventColor)
-            if self.outputs.get('end'):
+            row.append((fmt % tmpTimeStr, eventColor))
+            if outputs.get('end'):
                 timeFormat, tmpTimeStr = time_format(
                     self.decode_dtm(event, 'dtend'))
                 fmt = ' to ' + timeFormat
-                self.printer.msg(fmt % tmpTimeStr, eventColor)
-
-        if self.outputs.get('alarms'):
-            alarms = event.walk('valarm')
-            if alarms:
-                if isinstance(alarms[0].Decoded('trigger'), timedelta):
-                    minutes = -(alarms[0].Decoded('trigger')
-                                .total_seconds()/60)
-                    self.printer.msg(' AL:%.0fm' % minutes)
-                else:
-                    self.printer.msg(' AL: ??')
+                row.append((fmt % tmpTimeStr, eventColor))
+
+        if outputs.get('alarms'):
+            minutes = self.alarm_minutes(event)
+            if minutes is None:
+                row.append((' '*7, 'default'))
+            elif minutes == '??':
+                row.append((' AL: ??', 'default'))
             else:
-                self.printer.msg(' '*7)
-        if self.outputs.get('freebusy'):
-            free = ('transp' in event and
-                    event.Decoded('transp').decode() == 'TRANSPARENT')
-            self.printer.msg(' free ' if free else ' busy ',
-                             eventColor)
+                row.append((' AL:%.0fm' % minutes, 'default'))
+        if outputs.get('freebusy'):
+            row.append((' free ' if self.is_free(event)
+                        else ' busy ', eventColor))
 
-        self.printer.msg('  %s' % self.valid_title(event).strip(),
-                         eventColor)
+        row.append(('  %s' % self.valid_title(event).strip(),
+                    eventColor))
 
-        if (
-                self.outputs.get('location')
-                and 'location' in event
-                and event.Decoded('location').decode().strip()
-        ):
-            xstr = " [%s]" % (event.Decoded('location').
-                              decode().strip())
-            self.printer.msg(xstr, 'default')
+        if outputs.get('location'):
+            location = self.field_str(event, 'location')
+            if location and location.strip():
+                row.append((" [%s]" % location.strip(), 'default'))
 
-        if self.outputs.get('uid'):
-            xstr = " <%s>" % (event.Decoded('uid').decode().strip())
-            self.printer.msg(xstr, 'default')
+        if outputs.get('uid'):
+            row.append((" <%s>" % self.uid(event).strip(), 'default'))
 
-        self.printer.msg('\n')
+        row.append(('\n', 'default'))
 
-        if (
-                self.outputs.get('description') and 'description' in event
-                and event.Decoded('description').decode().strip()
-        ):
+        descr = (self.field_str(event, 'description')
+                 if outputs.get('description') else None)
+        if not (descr and descr.strip()):
+            self.printer.msg_runs(row)
+        else:
+            descr = descr.strip()
             descrIndent = outputsIndent + '  '
+            width = outputs.get('width')
             box = True  # leave old non-box code for option later
             if box:
-                topMarker = (descrIndent +
-                             self.printer.art['ulc'] +
-                             (self.printer.art['hrz'] *
-                              ((self.outputs.get('width')
-                                - len(descrIndent)) - 2)) +
-                             self.printer.art['urc'])
-                botMarker = (descrIndent +
-                             self.printer.art['llc'] +
-                             (self.printer.art['hrz'] *
-                              ((self.outputs.get('width')
-                                - len(descrIndent)) - 2)) +
-                             self.printer.art['lrc'])
+                topMarker, botMarker = box_markers(
+                    descrIndent, width, self.printer.art_style)
                 xstr = "%s  Description:\n%s\n%s\n%s\n" % (
                     outputsIndent,
                     topMarker,
-                    formatDescr(event.Decoded('description').
-                                decode().strip(), descrIndent, box),
+                    formatDescr(descr, descrIndent, box, width),
                     botMarker
                 )
             else:
-                marker = descrIndent + '-' * (
-                    (self.outputs.get('width') - len(descrIndent)))
+                marker = descrIndent + '-' * (width - len(descrIndent))
                 xstr = "%s  Description:\n%s\n%s\n%s\n" % (
                     outputsIndent,
                     marker,
-                    formatDescr(event.Decoded('description').
-                                decode().strip(), descrIndent, box),
+                    formatDescr(descr, descrIndent, box, width),
                     marker
                 )
-            self.printer.msg(xstr, 'default')
+            row.append((xstr, 'default'))
+            self.printer.msg_runs(row)
 
     def iterate_events(self, startDateTime, eventList, yearDate=True,
                        work=None, print_count=True,
@@ -967,24 +1236,32 @@ class IcalendarInterface:
 
         # 12 chars for day & length must match 'indent' in PrintEvent
         dayFormat = '\n%a %d-%b-%y' if yearDate else '\n%a %b %d  '
-        day = ''
+        # compare date objects to detect day changes and run strftime
+        # only when the day actually changes
+        last_day = None
+        day_str = ''
+
+        # bind the loop invariants once; the options and self.now do
+        # not change while one listing is printed
+        ignore_started = self.options['ignore_started']
+        ignore_declined = self.options['ignore_declined']
+        now = self.now
+        decode_dtm = self.decode_dtm
 
         for event in eventList:
-            if (
-                    self.options['ignore_started'] and
-                    (self.decode_dtm(event, 'dtstart') < self.now)
-            ):
+            start_dt = decode_dtm(event, 'dtstart')
+            if ignore_started and start_dt < now:
                 continue
-            if self.options['ignore_declined'] and self._DeclinedEvent(
-                    event):
+            if ignore_declined and self._DeclinedEvent(event):
                 continue
 
             selected += 1
-            tmpDayStr = self.decode_dtm(event, 'dtstart').strftime(
-                dayFormat)
-            prefix = None
-            if yearDate or tmpDayStr != day:
-                day = prefix = tmpDayStr
+            event_day = start_dt.date()
+            if event_day != last_day:
+                last_day = event_day
+                day_str = prefix = start_dt.strftime(dayFormat)
+            else:
+                prefix = day_str if yearDate else None
 
             self.PrintEvent(event, prefix, ev_type=ev_type)
 
@@ -1008,8 +1285,100 @@ class IcalendarInterface:
         if isinstance(d, datetime):
             return IcalendarInterface.display_timezone(d)
         else:
-            return IcalendarInterface.display_timezone(
-                datetime.combine(d, datetime.min.time()))
+            # combine attaches the timezone directly, skipping the
+            # hasattr/tzinfo branching in display_timezone
+            return datetime.combine(d, datetime.min.time(), LOCAL_TZ)
+
+    @staticmethod
+    def search_text(event, field):
+        r"""Return text of a field for regex search, or None if missing
+
+        The decoded text is cached on the event object itself, so
+        repeated searches over the same events do not re-decode the
+        field each time. Edits replace event objects rather than
+        mutating them, so the cache cannot go stale.
+
+        Parameters
+        ----------
+        event : icalendar Event
+        field : string (field to be searched)
+
+        Returns
+        -------
+        string or None
+        """
+        cache = getattr(event, 'field_text_cache', None)
+        if cache is None:
+            cache = event.field_text_cache = {}
+        if field not in cache:
+            if event.decoded(field, None) is None:
+                cache[field] = None
+            else:
+                s = event[field].to_ical()
+                if isinstance(s, bytes):
+                    s = s.decode()
+                cache[field] = s
+        return cache[field]
+
+    @staticmethod
+    def field_str(event, field):
+        r"""Decoded text of a field, cached on the event object
+
+        Companion of search_text for the display call sites, which
+        need Decoded (unescaped) text rather than the raw ical form.
+        As with the other per-event caches, edits replace event
+        objects rather than mutating them, so the cache cannot go
+        stale.
+
+        Parameters
+        ----------
+        event : icalendar Event
+        field : string
+
+        Returns
+        -------
+        string, or None if the event lacks the field
+        """
+        cache = getattr(event, 'field_str_cache', None)
+        if cache is None:
+            cache = event.field_str_cache = {}
+        if field not in cache:
+            cache[field] = (event.Decoded(field).decode()
+                            if field in event else None)
+        return cache[field]
+
+    @staticmethod
+    def make_matcher(pattern, ignore_case):
+        r"""Build a match predicate for one search pattern
+
+        Patterns without regex metacharacters (the common case for
+        REPL searches) are matched with the C-level substring
+        operator instead of the regex engine. Other patterns go
+        through RE2 when google-re2 is installed (guaranteed linear
+        time); patterns RE2 cannot express (backreferences,
+        lookaround) and all patterns without it use the stdlib engine
+
+        Parameters
+        ----------
+        pattern : regex or plain substring as a string
+        ignore_case : boolean
+
+        Returns
+        -------
+        function of the field text, truthy when it matches
+        """
+        if re.escape(pattern) == pattern:
+            if ignore_case:
+                needle = pattern.lower()
+                return lambda s: needle in s.lower()
+            return lambda s: pattern in s
+        if re2 is not None:
+            try:
+                return re2.compile(
+                    pattern, re2.IGNORECASE if ignore_case else 0).search
+            except re2.error:
+                pass
+        return re.compile(pattern, re.I if ignore_case else 0).search
 
     def event_match(self, event, start=None, end=None,
                     pattern=None, field='summary', ignore_case=True):
@@ -1020,9 +1389,11 @@ class IcalendarInterface:
         event : event (icalendar object) to be checked
         start : starting date (datetime object) for date searches
         end : ending date (datetime object) for date searches
-        pattern : regex pattern for text based searches
+        pattern : regex string, or a predicate from make_matcher,
+            for text based searches
         field : field to be searched for text based searches
-        ignore_case : do case insensitive matching (defaults to True)
+        ignore_case : do case insensitive matching (defaults to True;
+            ignored if pattern is already a predicate)
 
         Returns
         -------
@@ -1031,29 +1402,26 @@ class IcalendarInterface:
         AND
         a) the date based search (unless both start & end are None)
         """
-        event_start = self.to_datetime(event.Decoded('dtstart'))
-        if 'dtend' in event:
-            event_end = self.to_datetime(event.Decoded('dtend'))
-        elif 'duration' in event:
-            event_end = self.to_datetime(event.Decoded('dtstart')
-                                         + event.Decoded('duration'))
+        # decode_dtm caches the converted datetimes on the event, so
+        # a search followed by sorting and printing decodes each
+        # field once instead of once per use
+        event_start = self.decode_dtm(event, 'dtstart')
+        if 'dtend' in event or 'duration' in event:
+            event_end = self.decode_dtm(event, 'dtend')
         else:
             # special case where an event is punctual and has no end date
             event_end = event_start
-        date_in_range = not ((start and event_end < start) or
-                             (end and event_start > end))
-        flags = re.I if ignore_case else 0
+        # the date test is a couple of comparisons on cached values,
+        # so do it first: events outside the window never reach the
+        # (much costlier) pattern predicate
+        if (start and event_end < start) or (end and event_start > end):
+            return False
         if not pattern:
-            pat_match = True
-        elif event.decoded(field, None) is None:
-            pat_match = False
-        else:
-            s = event[field].to_ical()
-            if isinstance(s, bytes):
-                s = s.decode()
-            pat_match = (
-                re.search(pattern, s, flags=flags) is not None)
-        return date_in_range and pat_match
+            return True
+        if isinstance(pattern, str):
+            pattern = self.make_matcher(pattern, ignore_case)
+        s = self.search_text(event, field)
+        return s is not None and bool(pattern(s))
 
     def search_for_events(self, start, end, pattern, field='summary',
                           ev_type=ALL_EVENTS):
@@ -1083,23 +1451,51 @@ class IcalendarInterface:
         else:
             end = self.default_end
         self.save_last_search_spec(start, end, pattern, field)
+        if pattern:
+            # build the predicate once per query; event_match would
+            # otherwise hit the re module per event
+            pattern = self.make_matcher(pattern, ignore_case)
         if self.recur_uids and ev_type != NON_RECURRING_EVENTS:
+            # between already applies the date window to every
+            # occurrence it yields, so event_match need only run the
+            # text predicate (or nothing at all for date-only queries)
             events = self.recurring_events.between(start, end)
+            if pattern:
+                event_list = [ev for ev in events if self.event_match(
+                    ev, None, None, pattern, field, ignore_case)]
+            else:
+                event_list = list(events)
         else:
-            events = self.events
-        event_list = [ev for ev in events if self.event_match(
-            ev, start, end, pattern, field, ignore_case)]
-        if ev_type == NON_RECURRING_EVENTS:
-            event_list = [e for e in event_list
-                          if self.uid(e) not in self.recur_uids]
-        elif ev_type == RECURRING_EVENTS:
-            event_list = [e for e in event_list
-                          if self.uid(e) in self.recur_uids]
-        elif ev_type == ORIGINAL_OF_RECURRING_EVENTS:
-            uids = set(self.uid(e) for e in event_list) & self.recur_uids
-            event_list = [e for e in self.events if self.uid(e) in uids]
+            # slice the sorted index down to events whose dates can
+            # fall in the window; event_match still applies the
+            # exact date test to the survivors
+            lo = bisect_left(self.event_starts,
+                             start - self.max_event_span)
+            hi = bisect_right(self.event_starts, end)
+            events = self.events_by_start[lo:hi]
+            event_list = [ev for ev in events if self.event_match(
+                ev, start, end, pattern, field, ignore_case)]
+        if self.recur_uids:
+            # self.uid caches the decoded uid on the event, so each
+            # branch decodes it at most once per event
+            if ev_type == NON_RECURRING_EVENTS:
+                event_list = [e for e in event_list
+                              if self.uid(e) not in self.recur_uids]
+            elif ev_type == RECURRING_EVENTS:
+                event_list = [e for e in event_list
+                              if self.uid(e) in self.recur_uids]
+            elif ev_type == ORIGINAL_OF_RECURRING_EVENTS:
+                uids = self.recur_uids.intersection(
+                    self.uid(e) for e in event_list)
+                event_list = [self.event_by_uid[u] for u in uids]
+        elif ev_type != NON_RECURRING_EVENTS and ev_type != ALL_EVENTS:
+            # no recurring events at all, so the recurring-only
+            # selections are empty without decoding a single uid
+            event_list = []
+        # both key components come from the per-event caches, so on
+        # repeated queries the sort decodes nothing
         event_list.sort(key=lambda x: (self.decode_dtm(x, 'dtstart'),
-                                       x.Decoded('summary').decode()))
+                                       self.summary_text(x) or ''))
         return event_list
 
     def save_last_search_spec(self, start, end, search=None, field='summary'):
@@ -1116,10 +1512,12 @@ class IcalendarInterface:
         spec = ""
         if search:
             spec += f'Search for {search} in {field} '
+        # format specs in the f-string go straight to __format__,
+        # saving a method call per date over strftime
         if start:
-            spec += f'From {start.strftime("%Y-%m-%d(%H:%M)")} '
+            spec += f'From {start:%Y-%m-%d(%H:%M)} '
         if end:
-            spec += f'To {end.strftime("%Y-%m-%d(%H:%M)")}'
+            spec += f'To {end:%Y-%m-%d(%H:%M)}'
         self.last_search_spec = spec
 
     def display_queried_events(self, start, end, search=None, yearDate=True,
@@ -1214,25 +1612,21 @@ class IcalendarInterface:
 
         # convert start date to the beginning of the week or month
         if cmd == 'calw':
-            dayNum = self.cal_monday(int(start.strftime("%w")))
+            dayNum = self.wd_map[start.isoweekday() % 7]
             start -= timedelta(days=dayNum)
             weeks = count
             end = (start + timedelta(days=(weeks * 7)))
         elif cmd == 'cal5w':
-            dayNum = self.cal_monday(int(start.strftime("%w")))
+            dayNum = self.wd_map[start.isoweekday() % 7]
             start -= timedelta(days=(dayNum + count * 7))
             weeks = 2 * count + 1
             end = (start + timedelta(days=(weeks * 7)))
         else:  # cmd == 'calm':
             start = (start - timedelta(days=(start.day - 1)))
-            endMonth = (start.month + 1)
-            endYear = start.year
-            if endMonth == 13:
-                endMonth = 1
-                endYear += 1
-            end = start.replace(month=endMonth, year=endYear)
-            daysInMonth = (end - start).days
-            offsetDays = int(start.strftime('%w'))
+            # monthrange is a table lookup; no year-wrap bookkeeping
+            daysInMonth = monthrange(start.year, start.month)[1]
+            end = (start + timedelta(days=daysInMonth))
+            offsetDays = start.isoweekday() % 7
             if self.options['cal_monday']:
                 offsetDays -= 1
                 if offsetDays < 0:
@@ -1254,8 +1648,8 @@ class IcalendarInterface:
         self.events = self.backend_interface.events.copy()
         self.backend_cache_dirty = False
         self.setup_recurring_events()
-        now = datetime.now().strftime('%Y-%m-%d %H:%M')
-        self.printer.msg(f"Sync completed at {now}\n")
+        self.printer.msg(
+            f"Sync completed at {datetime.now():%Y-%m-%d %H:%M}\n")
 
     def delete(self, search_text='', start=None, end=None,
                field='summary'):
@@ -1315,7 +1709,9 @@ class IcalendarInterface:
                     if not IcalendarInterface.confirm("Delete y/n? "):
                         self.printer.msg("Event retained\n")
                         continue
-                self.backend_interface.delete_event(self.uid(event))
+                uid = self.uid(event)
+                self.backend_interface.delete_event(uid)
+                self.event_by_uid.pop(uid, None)
                 self.printer.msg("Event deleted\n")
                 if self.backend_interface.sync_after_edit:
                     self.backend_cache_dirty = True
@@ -1329,7 +1725,14 @@ class IcalendarInterface:
             if s == '':
                 return None
             try:
-                args = self.add_parser.parse_args(shlex.split(s))
+                # whitespace split suffices unless the line uses
+                # shell quoting or escapes; shlex runs a pure-Python
+                # state machine per character
+                if "'" not in s and '"' not in s and '\\' not in s:
+                    argv = s.split()
+                else:
+                    argv = shlex.split(s)
+                args = self.add_parser.parse_args(argv)
                 return args
                 break
             except Exception as e:
@@ -1408,7 +1811,13 @@ class IcalendarInterface:
                 for event in event_list:
                     self.iterate_events(None, [event], print_count=False,
                                         ev_type=ev_type)
-                    self.printer.msg(event.to_ical().decode() + '\n')
+                    # reuse the serialization cached by the backend
+                    # sync when present; the object is not mutated
+                    # (add() works on a reparsed copy)
+                    ics = getattr(event, 'cached_ics', None)
+                    if ics is None:
+                        ics = event.cached_ics = event.to_ical()
+                    self.printer.msg(ics.decode() + '\n')
                     if ev_type == ORIGINAL_OF_RECURRING_EVENTS:
                         self.printer.msg(warn_recur)
                     args = self.read_edit_args()
@@ -1422,6 +1831,7 @@ class IcalendarInterface:
             self.printer.msg('No events found\n')
 
     def preview_recurring_event(self, event):
+        import recurring_ical_events
         cal = Calendar()
         cal.add_component(event)
         recurring_events = recurring_ical_events.of(cal)
@@ -1511,25 +1921,22 @@ class IcalendarInterface:
                 start = datetime.fromisoformat(args.start)
             else:
                 if args.time:
-                    try:
-                        hh, mm = args.time.split(':')
-                        int(hh), int(mm)
-                    except Exception:
-                        raise Exception(
-                            'Time must be entered as hh:mm')
+                    # the argparse type= on --time has already
+                    # validated and split the hh:mm string
+                    hh, mm = args.time
                     if args.timezone:
                         tz = gettz(args.timezone)
                         if tz is None:
                             raise Exception(
                                 'Unknown timezone ' + args.timezone)
                     else:
-                        tz = tzlocal()
-                    start = datetime(year, month, day, int(hh),
-                                     int(mm), tzinfo=tz)
+                        tz = LOCAL_TZ
+                    start = datetime(year, month, day, hh, mm,
+                                     tzinfo=tz)
                 else:  # old is not None here
                     hh, mm = old_start.hour, old_start.minute
-                    start = datetime(year, month, day, int(hh),
-                                     int(mm), tzinfo=tzlocal())
+                    start = datetime(year, month, day, hh, mm,
+                                     tzinfo=LOCAL_TZ)
             if not (args.no_of_days or args.duration):
                 if old:
                     duration = old_duration
@@ -1550,8 +1957,7 @@ class IcalendarInterface:
         elif not args.noalarm:
             event = old
         else:
-            s = re.sub(r'BEGIN:VALARM.*END:VALARM\s*', '',
-                       old.to_ical().decode(), flags=re.DOTALL)
+            s = VALARM_RE.sub('', old.to_ical().decode())
             event = Calendar.from_ical(s)
 
         def add_or_change(event, field, value):
@@ -1576,9 +1982,13 @@ class IcalendarInterface:
         if args.location:
             add_or_change(event, 'location', args.location)
         if args.alarm:
-            if not (old and event.walk('valarm')):
-                event.add_component(Alarm())
-            alarm = event.walk('valarm')[0]
+            # walk traverses the whole component tree; do it once
+            alarms = event.walk('valarm')
+            if not (old and alarms):
+                alarm = Alarm()
+                event.add_component(alarm)
+            else:
+                alarm = alarms[0]
             add_or_change(alarm, 'action', 'DISPLAY')
             add_or_change(alarm, 'trigger',
                           timedelta(minutes=-args.alarm))
@@ -1635,14 +2045,20 @@ class IcalendarInterface:
             raise Exception(str(event.errors))
         out = event.to_ical().decode()
 
-        def lines(s):
-            return ("\n".join(s.splitlines())).splitlines(keepends=True)
-        diff = list(unified_diff(
-            lines(ics), lines(out), fromfile='Input', tofile='Parsed', n=0))
-        if diff:
+        # normalize line endings (to_ical emits \r\n while terminal
+        # input arrives with \n) and diff only when the round trip
+        # actually changed something; the common unchanged case then
+        # costs one string comparison instead of a difflib run
+        ics_norm = "\n".join(ics.splitlines())
+        out_norm = "\n".join(out.splitlines())
+        if ics_norm != out_norm:
+            from difflib import unified_diff
             self.printer.err_msg(
                 "ICS generated from parsed event differs from input ICS")
-            for line in diff:
+            for line in unified_diff(
+                    ics_norm.splitlines(keepends=True),
+                    out_norm.splitlines(keepends=True),
+                    fromfile='Input', tofile='Parsed', n=0):
                 self.printer.msg(line.strip())
             if not IcalendarInterface.confirm("Proceed y/n? "):
                 self.printer.msg("Action cancelled\n")
@@ -1657,6 +2073,89 @@ class IcalendarInterface:
         return True
 
 
+# The interactive command parser is stateless across parse_args
+# calls, so repl() builds it once and reuses it on every iteration
+def do_agenda(ecal, FLAGS):
+    ecal.AgendaQuery(start=FLAGS.start, end=FLAGS.end, days=FLAGS.days)
+
+
+def do_calw(ecal, FLAGS):
+    ecal.CalQuery('calw', count=FLAGS.weeks, startText=FLAGS.start)
+
+
+def do_cal5w(ecal, FLAGS):
+    ecal.CalQuery('cal5w', count=FLAGS.weeks, startText=FLAGS.start)
+
+
+def do_calm(ecal, FLAGS):
+    ecal.CalQuery('calm', startText=FLAGS.start)
+
+
+def do_search(ecal, FLAGS):
+    ecal.TextQuery(FLAGS.text[0], start=FLAGS.start, end=FLAGS.end,
+                   # field='uid' if FLAGS.uid else 'summary')
+                   field=FLAGS.property)
+
+
+def do_add(ecal, FLAGS):
+    ecal.add(FLAGS)
+
+
+def do_sync(ecal, FLAGS):
+    ecal.sync()
+
+
+def do_edit(ecal, FLAGS):
+    ecal.edit(FLAGS.text[0], start=FLAGS.start, end=FLAGS.end,
+              # field='uid' if FLAGS.uid else 'summary')
+              field=FLAGS.property)
+
+
+def do_delete(ecal, FLAGS):
+    ecal.delete(FLAGS.text[0], start=FLAGS.start, end=FLAGS.end,
+                # field='uid' if FLAGS.uid else 'summary')
+                field=FLAGS.property)
+
+
+def do_quit(ecal, FLAGS):
+    if (
+            ecal.backend_cache_dirty and ecal.no_auto_sync
+            and not IcalendarInterface.confirm(
+                "Changes made in calendar not yet synced. Quit y/n? ")
+    ):
+        pass
+    else:
+        ecal.interactive = False
+
+
+# command dispatch: both the short and long spellings map to one
+# handler, so repl() does a single dict lookup instead of walking an
+# if/elif ladder of list memberships
+DISPATCH = {
+    'g': do_agenda, 'agenda': do_agenda,
+    'w': do_calw, 'calw': do_calw,
+    '5w': do_cal5w, 'cal5w': do_cal5w,
+    'm': do_calm, 'calm': do_calm,
+    's': do_search, 'search': do_search,
+    'a': do_add, 'add': do_add,
+    'y': do_sync, 'sync': do_sync,
+    'e': do_edit, 'edit': do_edit,
+    'd': do_delete, 'delete': do_delete,
+    'q': do_quit, 'quit': do_quit,
+}
+
+interactive_parser = None
+# config modules keyed by (path, mtime): within one process the user
+# config is executed once, even when repl() is re-entered from the
+# top (tests, embedders)
+config_cache = {}
+# single worker running interactive auto-syncs while the user types;
+# created on first use
+sync_executor = None
+# piped (batch) input skips the prompt and terminal handling
+IS_TTY = sys.stdin.isatty()
+
+
 def repl(ecal=None):
     r"""Read Evaluate Print Loop (REPL)
 
@@ -1672,15 +2171,41 @@ def repl(ecal=None):
     -------
     IcalendarInterface or None
     """
+    global interactive_parser, sync_executor
     if ecal:
         # IcalendarInterface (ecal) already exists
         # So the first run is already over
         # ecal has been created and command line has been processed
         # So read next command from the terminal
-        parser = get_argument_parser(initial=False)
-        s = input("Enter new command\n")
+        if interactive_parser is None:
+            interactive_parser = get_argument_parser(initial=False)
+        parser = interactive_parser
+        if IS_TTY:
+            s = input("Enter new command\n")
+        else:
+            # commands piped in from a script: no prompt, no
+            # readline, and EOF means a clean quit instead of an
+            # EOFError out of input()
+            s = sys.stdin.readline()
+            if not s:
+                s = 'quit'
+        # an auto-sync submitted last turn ran while the user was
+        # typing; settle it before this command touches ecal
+        future = getattr(ecal, 'sync_future', None)
+        if future is not None:
+            ecal.sync_future = None
+            try:
+                future.result()
+            except Exception as e:
+                ecal.printer.err_msg(str(e) + '\n')
         try:
-            FLAGS = parser.parse_args(shlex.split(s))
+            # same fast path as read_edit_args: plain whitespace
+            # split unless the line uses quoting or escapes
+            if "'" not in s and '"' not in s and '\\' not in s:
+                argv = s.split()
+            else:
+                argv = shlex.split(s)
+            FLAGS = parser.parse_args(argv)
         except Exception as e:
             sys.stderr.write(str(e))
             parser.print_usage()
@@ -1701,10 +2226,16 @@ def repl(ecal=None):
             parser.print_usage()
             sys.exit(1)
         try:
-            spec = importlib.util.spec_from_file_location(
-                "config", expanduser(FLAGS.config))
-            config = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(config)
+            path = expanduser(FLAGS.config)
+            key = (path, getmtime(path))
+            config = config_cache.get(key)
+            if config is None:
+                import importlib.util
+                spec = importlib.util.spec_from_file_location(
+                    "config", path)
+                config = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(config)
+                config_cache[key] = config
             assert config.backend_interface
         except Exception as e:
             sys.stderr.write(str(e))
@@ -1715,10 +2246,12 @@ def repl(ecal=None):
                           art_style=FLAGS.lineart)
 
         if FLAGS.command is None:
-            # if no command given we simulate default command
-            default_command = "agenda"
-            parser = get_argument_parser(initial=True)
-            FLAGS = parser.parse_args(sys.argv[1:] + [default_command])
+            # if no command given we simulate the default command by
+            # parsing just that token into the namespace we already
+            # have: the globals keep their parsed values and the
+            # agenda subparser contributes its defaults, without
+            # re-parsing the whole command line
+            FLAGS = parser.parse_args(['agenda'], namespace=FLAGS)
 
         # create IcalendarInterface (ecal)
         ecal = IcalendarInterface(
@@ -1733,14 +2266,9 @@ def repl(ecal=None):
             # and may require sync() only if server updated from another device
             # Such backends can set the attribute sync_after_edit = False
             # If attribute is missing, we assume it is True
-        if hasattr(config, 'timezones') and 'tz' in config.timezones:
-            IcalendarInterface.calendar_tz = config.timezones['tz']
-        else:
-            IcalendarInterface.calendar_tz = UTC
-        if hasattr(config, 'timezones') and 'vtimezone' in config.timezones:
-            IcalendarInterface.vtimezone = config.timezones['vtimezone']
-        else:
-            IcalendarInterface.vtimezone = None
+        timezones = getattr(config, 'timezones', None) or {}
+        IcalendarInterface.calendar_tz = timezones.get('tz', UTC)
+        IcalendarInterface.vtimezone = timezones.get('vtimezone')
         ecal.interactive = FLAGS.interactive
         ecal.no_auto_sync = False
         if FLAGS.locale:
@@ -1759,52 +2287,9 @@ def repl(ecal=None):
         ecal.no_auto_sync = FLAGS.no_auto_sync
 
     try:
-        if FLAGS.command in ['g', 'agenda']:
-            ecal.AgendaQuery(start=FLAGS.start, end=FLAGS.end,
-                             days=FLAGS.days)
-
-        elif FLAGS.command in ['w', 'calw']:
-            ecal.CalQuery(
-                    'calw', count=FLAGS.weeks, startText=FLAGS.start)
-
-        elif FLAGS.command in ['5w', 'cal5w']:
-            ecal.CalQuery(
-                    'cal5w', count=FLAGS.weeks, startText=FLAGS.start)
-
-        elif FLAGS.command in ['m', 'calm']:
-            ecal.CalQuery('calm', startText=FLAGS.start)
-
-        elif FLAGS.command in ['s', 'search']:
-            ecal.TextQuery(FLAGS.text[0], start=FLAGS.start,
-                           end=FLAGS.end,
-                           # field='uid' if FLAGS.uid else 'summary')
-                           field=FLAGS.property)
-
-        elif FLAGS.command in ['a', 'add']:
-            ecal.add(FLAGS)
-
-        elif FLAGS.command in ['y', 'sync']:
-            ecal.sync()
-
-        elif FLAGS.command in ['e', 'edit']:
-            ecal.edit(FLAGS.text[0], start=FLAGS.start, end=FLAGS.end,
-                      # field='uid' if FLAGS.uid else 'summary')
-                      field=FLAGS.property)
-
-        elif FLAGS.command in ['d', 'delete']:
-            ecal.delete(FLAGS.text[0], start=FLAGS.start, end=FLAGS.end,
-                        # field='uid' if FLAGS.uid else 'summary')
-                        field=FLAGS.property)
-
-        elif FLAGS.command in ['q', 'quit']:
-            if (
-                    ecal.backend_cache_dirty and ecal.no_auto_sync
-                    and not IcalendarInterface.confirm(
-                        "Changes made in calendar not yet synced. Quit y/n? ")
-            ):
-                pass
-            else:
-                ecal.interactive = False
+        handler = DISPATCH.get(FLAGS.command)
+        if handler:
+            handler(ecal, FLAGS)
 
     except Exception as exc:
         ecal.printer.err_msg(str(exc)+'\n')
@@ -1812,10 +2297,21 @@ def repl(ecal=None):
             print_exc()
         return ecal if ecal.interactive else None
 
-    if ecal.backend_cache_dirty and not ecal.no_auto_sync:
+    dirty = ecal.backend_cache_dirty
+    if dirty and not ecal.no_auto_sync:
         ecal.printer.msg("Syncing changes made in calendar\n")
-        ecal.sync()
-    if ecal.backend_cache_dirty:
+        if ecal.interactive:
+            # run the sync (often network I/O) while the user reads
+            # the output and types the next command; the future is
+            # settled at the top of the next turn, so no command ever
+            # runs against a half-rebuilt calendar
+            if sync_executor is None:
+                sync_executor = ThreadPoolExecutor(max_workers=1)
+            ecal.sync_future = sync_executor.submit(ecal.sync)
+        else:
+            ecal.sync()
+            dirty = ecal.backend_cache_dirty
+    if dirty and getattr(ecal, 'sync_future', None) is None:
         ecal.printer.msg("Changes made in calendar not yet synced\n")
     if ecal.interactive:
         return ecal  # Returning non None continues the REPL loop
@@ -1824,14 +2320,20 @@ def repl(ecal=None):
 
 
 def main():
+    # install the handler only when run as a program; importers keep
+    # their own SIGINT handling
+    signal.signal(signal.SIGINT, SIGINT_handler)
     # Start Read Evaluate Print Loop (REPL)
     ecal = repl()
     # Keep running REPL until it returns None
     while ecal:
         # The REPL may keep running for many hours/days
         # The date/time stored in ecal's "now" variable may become very stale
-        # So we set ecal's "now" variable before running each command.
-        ecal.set_now()
+        # So we set ecal's "now" variable before running each command,
+        # unless it was refreshed less than a second ago (batch runs
+        # piping thousands of commands need not recompute it per line)
+        if monotonic() - ecal.now_set_at > 1.0:
+            ecal.set_now()
         ecal = repl(ecal=ecal)
 
 
@@ -1840,8 +2342,5 @@ def SIGINT_handler(signum, frame):
     sys.exit(1)
 
 
-signal.signal(signal.SIGINT, SIGINT_handler)
-
-
 if __name__ == '__main__':
     main()
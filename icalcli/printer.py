@@ -79,6 +79,8 @@ class Printer(object):
                 'brightwhite': '${color white}' if conky else '\033[37;1m',
                 None: '' if conky else '\033[0m'}
         self.colorset = set(self.colors.keys())
+        # the reset code ends every colored fragment; resolve it once
+        self.reset = self.colors['default']
 
         self.art_style = art_style
         self.art = ART_CHARS[self.art_style]
@@ -92,9 +94,25 @@ class Printer(object):
     def msg(self, msg, colorname='default', file=None):
         file = file or self.stdout
         if self.use_color:
-            msg = self.colors[colorname] + msg + self.colors['default']
+            msg = self.colors[colorname] + msg + self.reset
         file.write(_u(msg))
 
+    def msg_runs(self, runs, file=None):
+        """Emit a list of (text, colorname) runs with a single write
+
+        Used by the calendar renderer, which would otherwise make
+        many small msg calls (and hence stream writes) per output
+        line
+        """
+        file = file or self.stdout
+        if self.use_color:
+            default = self.reset
+            file.write(''.join(
+                self.colors[colorname] + _u(text) + default
+                for text, colorname in runs))
+        else:
+            file.write(''.join(_u(text) for text, colorname in runs))
+
     def err_msg(self, msg):
         self.msg(msg, 'brightred', file=self.stderr)
 